@@ -1,11 +1,15 @@
+import json
 import logging
-from typing import Optional
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from unittest import mock
 
 import pytest
 import responses
 
-from cumulusci.core.config import ServiceConfig, TaskConfig
+from cumulusci.core.config import OrgConfig, ServiceConfig, TaskConfig
 from cumulusci.core.dependencies.dependencies import PackageVersionIdDependency
 from cumulusci.core.exceptions import (
     CumulusCIException,
@@ -13,11 +17,84 @@ from cumulusci.core.exceptions import (
     TaskOptionsError,
 )
 from cumulusci.tasks.github.tests.util_github_api import GithubApiTestMixin
+from cumulusci.tasks.salesforce import promote_package_version
 from cumulusci.tasks.salesforce.promote_package_version import PromotePackageVersion
 from cumulusci.tests.util import CURRENT_SF_API_VERSION, create_project_config
 
+DEVHUB_BASE_URL = (
+    f"https://devhub.my.salesforce.com/services/data/v{CURRENT_SF_API_VERSION}"
+)
+TOOLING_QUERY_URL = f"{DEVHUB_BASE_URL}/tooling/query/"
+PACKAGE2VERSION_URL_RE = re.compile(
+    rf"{re.escape(DEVHUB_BASE_URL)}/tooling/sobjects/Package2Version/\w+"
+)
+# sObject name and the filtered Id value of the tooling queries the task makes
+SOQL_FILTER_RE = re.compile(r"FROM (\w+) WHERE \w+='([^']*)'")
 
-@pytest.fixture
+# Expected error messages, compiled once for pytest.raises(match=...)
+INVALID_VERSION_ID_ERROR = re.compile(
+    re.escape(
+        "Task option `version_id` must be a valid SubscriberPackageVersion (04t) Id"
+    )
+)
+NO_RECORDS_ERROR = re.compile(
+    re.escape(
+        "No records returned for query: "
+        "SELECT Id, Field__c FROM sObjectName WHERE Id='12345'"
+    )
+)
+
+
+def _query_body(records: List[Dict]) -> str:
+    """Serialize a Tooling API query response containing `records`"""
+    return json.dumps({"size": len(records), "records": records, "done": True})
+
+
+@lru_cache(maxsize=None)
+def _dependency_payloads(
+    dependency_num: int, is_two_gp: bool, is_promoted: bool
+) -> Mapping[Tuple[str, str], str]:
+    """
+    Serialized query responses for a single dependency, keyed by
+    (sObject, Id). Cached, so the mapping is returned read-only.
+    """
+    spv_id = f"04t00000000000{dependency_num}"
+    bodies = {
+        ("SubscriberPackageVersion", spv_id): _query_body(
+            [
+                {
+                    "SubscriberPackageId": str(dependency_num),
+                    "ReleaseState": "Released" if is_promoted else "Beta",
+                }
+            ]
+        ),
+        ("SubscriberPackage", str(dependency_num)): _query_body(
+            [{"Name": f"Dependency_Package_{dependency_num}"}]
+        ),
+    }
+    # 1GP dependencies have no Package2Version record
+    bodies["Package2Version", spv_id] = _query_body(
+        [{"Id": f"dep_{dependency_num}", "IsReleased": is_promoted}]
+        if is_two_gp
+        else []
+    )
+    return MappingProxyType(bodies)
+
+
+# Tasks copy their options out of the TaskConfig, so one instance can be shared
+TASK_CONFIG = TaskConfig(
+    {
+        "options": {
+            "version_id": "04t000000000000",
+            "auto_promote": False,
+        }
+    }
+)
+
+
+# The task and its configs are built once and shared by every test in this
+# module; the `task` fixture undoes any changes a test makes to the task.
+@pytest.fixture(scope="module")
 def project_config():
     project_config = create_project_config()
     project_config.keychain.set_service(
@@ -36,34 +113,143 @@ def project_config():
     return project_config
 
 
-@pytest.fixture
-def task(project_config, devhub_config, org_config):
-    task = PromotePackageVersion(
-        project_config,
-        TaskConfig(
-            {
-                "options": {
-                    "version_id": "04t000000000000",
-                    "auto_promote": False,
-                }
-            }
-        ),
-        org_config,
+# devhub_config and org_config deliberately override the function-scoped
+# fixtures of the same name in cumulusci/tasks/tests/conftest.py so that the
+# module-scoped task can use them. Keep them in sync with the conftest versions.
+@pytest.fixture(scope="module")
+def devhub_config():
+    org_config = OrgConfig(
+        {"instance_url": "https://devhub.my.salesforce.com", "access_token": "token"},
+        "devhub",
     )
-    with mock.patch(
-        "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-        return_value=devhub_config,
-    ):
-        task._init_task()
+    org_config.refresh_oauth_token = mock.Mock()
+    return org_config
+
+
+@pytest.fixture(scope="module")
+def org_config():
+    org_config = OrgConfig(
+        {
+            "instance_url": "https://scratch.my.salesforce.com",
+            "access_token": "token",
+            "config_file": "orgs/scratch_def.json",
+        },
+        "dev",
+    )
+    org_config.refresh_oauth_token = mock.Mock()
+    return org_config
+
+
+@pytest.fixture(scope="module", autouse=True)
+def patch_devhub_config(devhub_config):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            promote_package_version,
+            "get_devhub_config",
+            lambda project_config: devhub_config,
+        )
+        yield
+
+
+@pytest.fixture(scope="module")
+def initialized_task(project_config, org_config, patch_devhub_config):
+    task = PromotePackageVersion(project_config, TASK_CONFIG, org_config)
+    task._init_task()
     return task
 
 
+@pytest.fixture
+def task(initialized_task):
+    """The module's initialized task, with any changes undone after each test"""
+    options = initialized_task.options.copy()
+    tooling = initialized_task.tooling
+    yield initialized_task
+    initialized_task.options = options
+    initialized_task.tooling = tooling
+    initialized_task.return_values = {}
+
+
+@pytest.fixture(scope="module")
+def raw_task(project_config, org_config):
+    """A task without a Tooling API connection, for tests that make no requests"""
+    return PromotePackageVersion(project_config, TASK_CONFIG, org_config)
+
+
+@pytest.fixture(scope="module")
+def module_rsps():
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        yield rsps
+
+
+@pytest.fixture
+def rsps(module_rsps):
+    """Share one started RequestsMock, clearing its registrations after each test"""
+    yield module_rsps
+    module_rsps.reset()
+
+
 class TestPromotePackageVersion(GithubApiTestMixin):
-    devhub_base_url = (
-        f"https://devhub.my.salesforce.com/services/data/v{CURRENT_SF_API_VERSION}"
-    )
+    tooling_responses = None
+    promoted_ids = None
+
+    def _mock_tooling_api(
+        self, rsps: responses.RequestsMock
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Register the Tooling API mocks for this test (once) and return the
+        serialized query responses they serve, keyed by (sObject, Id).
 
-    def _mock_target_package_api_calls(self, install_key: Optional[str] = None):
+        All queries are served by a single callback which looks up the
+        response by the object name and Id parsed out of the SOQL, so the
+        order in which the task issues its queries does not matter.
+        A query without a registered response fails the test.
+
+        Each callback answers many requests, so these mocks must stay in
+        the default registry; responses' OrderedRegistry would discard them
+        after their first match.
+        """
+        if self.tooling_responses is None:
+            self.tooling_responses = {}
+            self.promoted_ids = []
+            rsps.add_callback(
+                "GET",
+                TOOLING_QUERY_URL,
+                callback=self._tooling_query_callback,
+                content_type="application/json",
+            )
+            rsps.add_callback(
+                "PATCH",
+                PACKAGE2VERSION_URL_RE,
+                callback=self._promote_callback,
+            )
+        return self.tooling_responses
+
+    def _add_tooling_records(
+        self,
+        rsps: responses.RequestsMock,
+        sobject: str,
+        record_id: str,
+        records: List[Dict],
+    ) -> None:
+        """Return `records` from queries against `sobject` filtered on `record_id`"""
+        self._mock_tooling_api(rsps)[sobject, record_id] = _query_body(records)
+
+    def _tooling_query_callback(self, request):
+        query = request.params["q"]
+        match = SOQL_FILTER_RE.search(query)
+        if not match:
+            pytest.fail(f"Unexpected Tooling API query: {query}")
+        if match.groups() not in self.tooling_responses:
+            pytest.fail(f"No mocked response for Tooling API query: {query}")
+        return (200, {}, self.tooling_responses[match.groups()])
+
+    def _promote_callback(self, request):
+        self.promoted_ids.append(request.path_url.rsplit("/", 1)[1])
+        return (204, {}, "")
+
+    def _mock_target_package_api_calls(
+        self, rsps: responses.RequestsMock, install_key: Optional[str] = None
+    ):
         record = {
             "BuildNumber": 0,
             "Id": "main_package",
@@ -75,22 +261,15 @@ class TestPromotePackageVersion(GithubApiTestMixin):
         if install_key:
             record["InstallKey"] = install_key
 
-        responses.add(  # query for main package's Package2Version info
-            "GET",
-            f"{self.devhub_base_url}/tooling/query/",
-            json={
-                "size": 1,
-                "records": [record],
-                "done": True,
-            },
-        )
-        responses.add(  # Promote the Package2Version
-            "PATCH",
-            f"{self.devhub_base_url}/tooling/sobjects/Package2Version/main_package",
-        )
+        # query for main package's Package2Version info
+        self._add_tooling_records(rsps, "Package2Version", "04t000000000000", [record])
 
     def _mock_dependencies(
-        self, total_deps: int, num_2gp: int, num_unpromoted: int
+        self,
+        rsps: responses.RequestsMock,
+        total_deps: int,
+        num_2gp: int,
+        num_unpromoted: int,
     ) -> None:
         """
         Mock all API calls to represent the dependencies requested in params
@@ -103,161 +282,46 @@ class TestPromotePackageVersion(GithubApiTestMixin):
             {"subscriberPackageVersionId": f"04t00000000000{i + 1}"}
             for i in range(total_deps)
         ]
-        responses.add(  # query to find dependency packages
-            "GET",
-            f"{self.devhub_base_url}/tooling/query/",
-            json={
-                "size": 1,
-                "records": [{"Dependencies": {"ids": spv_ids}}],
-                "done": True,
-            },
+        # query to find dependency packages
+        self._add_tooling_records(
+            rsps,
+            "SubscriberPackageVersion",
+            "04t000000000000",
+            [{"Dependencies": {"ids": spv_ids}}],
         )
-        # mock 1GP dependencies
-        for i in range(total_deps - num_2gp):
-            self._mock_dependency(i + 1, is_two_gp=False)
-
-        # mock unpromoted 2GP dependencies
-        for i in range(num_unpromoted):
-            self._mock_dependency(i + 1, is_two_gp=True)
-
-        # mock promoted 2GP dependencies
-        for i in range(num_2gp - num_unpromoted):
-            self._mock_dependency(i + 1, is_two_gp=True, is_promoted=True)
+        num_1gp = total_deps - num_2gp
+        for i in range(total_deps):
+            dependency_num = i + 1
+            self._mock_dependency(
+                rsps,
+                dependency_num,
+                is_two_gp=dependency_num > num_1gp,
+                is_promoted=dependency_num > num_1gp + num_unpromoted,
+            )
 
     def _mock_dependency(
-        self, dependency_num: int, is_two_gp: bool = False, is_promoted: bool = False
+        self,
+        rsps: responses.RequestsMock,
+        dependency_num: int,
+        is_two_gp: bool = False,
+        is_promoted: bool = False,
     ) -> None:
         """Mock the API calls for a single dependency"""
-        responses.add(  # query for SubscriberPackageVersion
-            "GET",
-            f"{self.devhub_base_url}/tooling/query/",
-            json={
-                "size": 1,
-                "records": [
-                    {
-                        "SubscriberPackageId": str(dependency_num),
-                        "ReleaseState": "Released" if is_promoted else "Beta",
-                    }
-                ],
-                "done": True,
-            },
-        )
-        responses.add(  # query for SubscriberPackage
-            "GET",
-            f"{self.devhub_base_url}/tooling/query/",
-            json={
-                "size": 1,
-                "records": [{"Name": f"Dependency_Package_{dependency_num}"}],
-                "done": True,
-            },
+        self._mock_tooling_api(rsps).update(
+            _dependency_payloads(dependency_num, is_two_gp, is_promoted)
         )
 
-        one_gp_json = {"size": 0, "records": [], "done": True}
-        two_gp_json = {
-            "size": 1,
-            "records": [{"Id": f"dep_{dependency_num}", "IsReleased": False}],
-            "done": True,
-        }
-        responses.add(  # query for Package2Version
-            "GET",
-            f"{self.devhub_base_url}/tooling/query/",
-            json=(two_gp_json if is_two_gp else one_gp_json),
-        )
-
-        if is_two_gp:
-            responses.add(
-                "PATCH",
-                f"{self.devhub_base_url}/tooling/sobjects/Package2Version/dep_{dependency_num}",
-            )
-
-    def test_run_task__invalid_version_id(
-        self, project_config, devhub_config, org_config
-    ):
-        with pytest.raises(TaskOptionsError):
-            PromotePackageVersion(
-                project_config,
-                TaskConfig({"options": {"version_id": "0Ho000000000000"}}),
-                org_config,
-            )
-
-    @responses.activate
-    def test_run_task(self, task, devhub_config):
-        # 20 dependencies, 10 are 2GP, 5 of those are not yet promoted
-        self._mock_dependencies(20, 10, 5)
-        self._mock_target_package_api_calls()
-        with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            task()
-
-    @responses.activate
-    def test_run_task__install_key(self, task, devhub_config):
-        # 20 dependencies, 10 are 2GP, 5 of those are not yet promoted
-        task.options["install_key"] = "hunter2"
-        self._mock_dependencies(20, 10, 5)
-        self._mock_target_package_api_calls(install_key="hunter2")
-        with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            with mock.patch(
-                "cumulusci.tasks.salesforce.promote_package_version.get_simple_salesforce_connection",
-            ) as get_connection:
-                task()
-                assert (
-                    "hunter2"
-                    in get_connection.return_value.query_all.call_args_list[0][0][0]
-                )
-
-    @responses.activate
-    def test_run_task__no_dependencies(self, task, devhub_config):
-        self._mock_dependencies(0, 0, 0)
-        self._mock_target_package_api_calls()
-        with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            task()
-
-    @responses.activate
-    def test_run_task__promote_dependencies(self, task, devhub_config):
-        self._mock_dependencies(2, 1, 1)
-        self._mock_target_package_api_calls()
-        with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            task.options["promote_dependencies"] = True
-            task()
-
-        assert task.return_values["version_id"] == "04t000000000000"
-        assert task.return_values["version_number"] == "1.0.0.0"
-        assert task.return_values["dependencies"] == [
-            PackageVersionIdDependency(version_id="04t000000000001"),
-            PackageVersionIdDependency(version_id="04t000000000002"),
-        ]
-
-    @responses.activate
-    def test_run_task__all_deps_promoted(self, task, devhub_config):
-        self._mock_dependencies(4, 4, 4)
-        self._mock_target_package_api_calls()
-        with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            task.options["auto_promote"] = True
-            task()
-
-    @responses.activate
-    def test_run_task__resolve_version_id(self, task, devhub_config):
-        responses.add(  # query for repository
+    def _mock_beta_release(
+        self, rsps: responses.RequestsMock, tag_message: str
+    ) -> None:
+        """Mock the GitHub API calls to resolve the latest beta tag"""
+        rsps.add(  # query for repository
             "GET",
             "https://api.github.com/repos/TestOwner/TestRepo",
             json=self._get_expected_repo("TestOwner", "TestRepo"),
             status=200,
         )
-        responses.add(  # query for releases (project_config.get_latest_tag)
+        rsps.add(  # query for releases (project_config.get_latest_tag)
             "GET",
             "https://api.github.com/repos/TestOwner/TestRepo/releases?per_page=100",
             json=self._get_expected_releases(
@@ -267,122 +331,112 @@ class TestPromotePackageVersion(GithubApiTestMixin):
             ),
             status=200,
         )
-        responses.add(  # query for ref to tag
+        rsps.add(  # query for ref to tag
             "GET",
             "https://api.github.com/repos/TestOwner/TestRepo/git/ref/tags/beta/1.113-Beta_1",
             json=self._get_expected_tag_ref("tag_SHA", "tag_SHA"),
             status=200,
         )
-        responses.add(  # query for tag
+        rsps.add(  # query for tag
             "GET",
             "https://api.github.com/repos/TestOwner/TestRepo/git/tags/tag_SHA",
-            json=self._get_expected_tag(
-                "beta/1.0",
-                "tag_SHA",
-                message="Release for Beta v1.113\n\nversion_id: 04t000000000000\n\ndependencies: []",
-            ),
+            json=self._get_expected_tag("beta/1.0", "tag_SHA", message=tag_message),
             status=200,
         )
-        self._mock_dependencies(2, 1, 0)
-        self._mock_target_package_api_calls()
+
+    def test_run_task__invalid_version_id(self, project_config, org_config):
+        with pytest.raises(TaskOptionsError, match=INVALID_VERSION_ID_ERROR):
+            PromotePackageVersion(
+                project_config,
+                TaskConfig({"options": {"version_id": "0Ho000000000000"}}),
+                org_config,
+            )
+
+    @pytest.mark.parametrize(
+        "dependencies,options,promoted_ids",
+        [
+            # 20 dependencies, 10 are 2GP, 5 of those are not yet promoted
+            ((20, 10, 5), {}, []),
+            (
+                (4, 4, 4),
+                {"promote_dependencies": True},
+                ["dep_1", "dep_2", "dep_3", "dep_4", "main_package"],
+            ),
+            ((0, 0, 0), {}, ["main_package"]),
+        ],
+        ids=["unpromoted_deps", "promote_all_deps", "no_dependencies"],
+    )
+    def test_run_task(self, task, rsps, dependencies, options, promoted_ids):
+        self._mock_dependencies(rsps, *dependencies)
+        self._mock_target_package_api_calls(rsps)
+        task.options.update(options)
+        task()
+
+        assert self.promoted_ids == promoted_ids
+
+    def test_run_task__install_key(self, task, rsps):
+        # 20 dependencies, 10 are 2GP, 5 of those are not yet promoted
+        task.options["install_key"] = "hunter2"
+        self._mock_dependencies(rsps, 20, 10, 5)
+        self._mock_target_package_api_calls(rsps, install_key="hunter2")
         with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            task.options["version_id"] = None
+            "cumulusci.tasks.salesforce.promote_package_version.get_simple_salesforce_connection",
+        ) as get_connection:
             task()
+            assert (
+                "hunter2"
+                in get_connection.return_value.query_all.call_args_list[0][0][0]
+            )
 
-    @responses.activate
-    def test_run_task__resolve_version_id_dependency_error(self, task, devhub_config):
-        responses.add(  # query for repository
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo",
-            json=self._get_expected_repo("TestOwner", "TestRepo"),
-            status=200,
-        )
-        responses.add(  # query for releases (project_config.get_latest_tag)
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo/releases?per_page=100",
-            json=self._get_expected_releases(
-                "TestOwner",
-                "TestRepo",
-                ["beta/1.113-Beta_1", "whatisthis/0.0.1", "release/0.0.1"],
-            ),
-            status=200,
-        )
-        responses.add(  # query for ref to tag
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo/git/ref/tags/beta/1.113-Beta_1",
-            json=self._get_expected_tag_ref("tag_SHA", "tag_SHA"),
-            status=200,
-        )
-        responses.add(  # query for tag
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo/git/tags/tag_SHA",
-            json=self._get_expected_tag(
-                "beta/1.0",
-                "tag_SHA",
-                message="Release for Beta v1.113\n\ndependencies: []",
-            ),
-            status=200,
+    def test_run_task__promote_dependencies(self, task, rsps):
+        self._mock_dependencies(rsps, 2, 1, 1)
+        self._mock_target_package_api_calls(rsps)
+        task.options["promote_dependencies"] = True
+        task()
+
+        assert self.promoted_ids == ["dep_2", "main_package"]
+        assert task.return_values["version_id"] == "04t000000000000"
+        assert task.return_values["version_number"] == "1.0.0.0"
+        assert task.return_values["dependencies"] == [
+            PackageVersionIdDependency(version_id="04t000000000001"),
+            PackageVersionIdDependency(version_id="04t000000000002"),
+        ]
+
+    def test_run_task__resolve_version_id(self, task, rsps):
+        self._mock_beta_release(
+            rsps,
+            "Release for Beta v1.113\n\nversion_id: 04t000000000000\n\ndependencies: []",
         )
-        self._mock_dependencies(2, 1, 0)
-        self._mock_target_package_api_calls()
-        with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            task.options["version_id"] = None
-            with pytest.raises(DependencyLookupError):
-                task()
+        self._mock_dependencies(rsps, 2, 1, 0)
+        self._mock_target_package_api_calls(rsps)
+        task.options["version_id"] = None
+        task()
+
+        # the only 2GP dependency is already promoted, so the target is promoted
+        assert self.promoted_ids == ["main_package"]
+
+    def test_run_task__resolve_version_id_dependency_error(self, task, rsps):
+        self._mock_beta_release(rsps, "Release for Beta v1.113\n\ndependencies: []")
+        self._mock_dependencies(rsps, 2, 1, 0)
+        self._mock_target_package_api_calls(rsps)
+        task.options["version_id"] = None
+        with pytest.raises(DependencyLookupError):
+            task()
 
-    @responses.activate
     def test_run_task__resolve_version_id_dependency_error_malformed_version(
-        self, task, devhub_config, caplog
+        self, task, rsps, caplog
     ):
-        responses.add(  # query for repository
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo",
-            json=self._get_expected_repo("TestOwner", "TestRepo"),
-            status=200,
+        self._mock_beta_release(
+            rsps,
+            "Release for Beta v1.113\n\nversion_id: malformedId\n\ndependencies: []",
         )
-        responses.add(  # query for releases (project_config.get_latest_tag)
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo/releases?per_page=100",
-            json=self._get_expected_releases(
-                "TestOwner",
-                "TestRepo",
-                ["beta/1.113-Beta_1", "whatisthis/0.0.1", "release/0.0.1"],
-            ),
-            status=200,
-        )
-        responses.add(  # query for ref to tag
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo/git/ref/tags/beta/1.113-Beta_1",
-            json=self._get_expected_tag_ref("tag_SHA", "tag_SHA"),
-            status=200,
-        )
-        responses.add(  # query for tag
-            "GET",
-            "https://api.github.com/repos/TestOwner/TestRepo/git/tags/tag_SHA",
-            json=self._get_expected_tag(
-                "beta/1.0",
-                "tag_SHA",
-                message="Release for Beta v1.113\n\nversion_id: malformedId\n\ndependencies: []",
-            ),
-            status=200,
-        )
-        self._mock_dependencies(2, 1, 0)
-        self._mock_target_package_api_calls()
-        with mock.patch(
-            "cumulusci.tasks.salesforce.promote_package_version.get_devhub_config",
-            return_value=devhub_config,
-        ):
-            task.options["version_id"] = None
-            with pytest.raises(DependencyLookupError):
-                task()
+        self._mock_dependencies(rsps, 2, 1, 0)
+        self._mock_target_package_api_calls(rsps)
+        task.options["version_id"] = None
+        with pytest.raises(DependencyLookupError):
+            task()
 
-    def test_process_one_gp_dependencies(self, task, caplog):
+    def test_process_one_gp_dependencies(self, raw_task, caplog):
         """Ensure proper logging output"""
         dependencies = [
             {
@@ -396,15 +450,14 @@ class TestPromotePackageVersion(GithubApiTestMixin):
                 "release_state": "Beta",
             },
         ]
-        task._process_one_gp_deps(dependencies)
-        assert (
-            "This package has the following 1GP dependencies:"
-            == caplog.records[1].message
-        )
-        assert "Package Name: Dependency 1" in caplog.records[3].message
-        assert "Release State: Beta" in caplog.records[4].message
-
-    def test_process_two_gp_dependencies(self, task, caplog):
+        caplog.set_level(logging.INFO, logger=raw_task.logger.name)
+        raw_task._process_one_gp_deps(dependencies)
+        messages = caplog.messages
+        assert "This package has the following 1GP dependencies:" == messages[1]
+        assert "Package Name: Dependency 1" in messages[3]
+        assert "Release State: Beta" in messages[4]
+
+    def test_process_two_gp_dependencies(self, raw_task, caplog):
         """Ensure proper logging output"""
         dependencies = [
             {"is_2gp": False, "name": "Dependency 1", "release_state": "Beta"},
@@ -416,32 +469,31 @@ class TestPromotePackageVersion(GithubApiTestMixin):
                 "version_id": "04t000000000002",
             },
         ]
-        with caplog.at_level(logging.INFO):
-            task._process_two_gp_deps(dependencies)
-        assert caplog.records[1].message == "Total 2GP dependencies: 1"
-        assert caplog.records[2].message == "Unpromoted 2GP dependencies: 1"
+        caplog.set_level(logging.INFO, logger=raw_task.logger.name)
+        raw_task._process_two_gp_deps(dependencies)
+        messages = caplog.messages
+        assert messages[1] == "Total 2GP dependencies: 1"
+        assert messages[2] == "Unpromoted 2GP dependencies: 1"
         assert (
             "This package depends on other packages that have not yet been promoted."
-            == caplog.records[4].message
+            == messages[4]
         )
-        assert "Package Name: Dependency 2" in caplog.records[8].message
+        assert "Package Name: Dependency 2" in messages[8]
 
-    @responses.activate
-    def test_query_Package2Version__malformed_request(self, task):
-        responses.add(
+    def test_query_Package2Version__malformed_request(self, task, rsps):
+        rsps.add(
             "GET",
-            f"{self.devhub_base_url}/tooling/query/",
+            TOOLING_QUERY_URL,
             json=[{"message": "Object type 'Package2' is not supported"}],
             status=400,
         )
         with pytest.raises(TaskOptionsError):
             task._query_Package2Version("04t000000000000")
 
-    @responses.activate
-    def test_query_one_tooling(self, task):
-        responses.add(
+    def test_query_one_tooling(self, task, rsps):
+        rsps.add(
             "GET",
-            f"{self.devhub_base_url}/tooling/query/",
+            TOOLING_QUERY_URL,
             json={
                 "size": 2,
                 "records": [{"name": "Thing_1"}, {"name": "Thing_2"}],
@@ -451,41 +503,35 @@ class TestPromotePackageVersion(GithubApiTestMixin):
         obj = task._query_one_tooling(["name"], "sObjectName")
         assert not isinstance(obj, list)
 
-    @responses.activate
-    def test_query_tooling__return_none(self, task):
-        responses.add(
-            "GET",
-            f"{self.devhub_base_url}/tooling/query/",
-            json={"size": 0, "records": [], "done": True},
-        )
-        result = task._query_tooling(["Id", "name"], "sObjectName")
-        assert result is None
-
-    @responses.activate
-    def test_query_tooling__return_multiple(self, task):
-        responses.add(
+    @pytest.mark.parametrize(
+        "records,expected",
+        [
+            ([], None),
+            (
+                [{"name": "Thing_1"}, {"name": "Thing_2"}],
+                [{"name": "Thing_1"}, {"name": "Thing_2"}],
+            ),
+        ],
+        ids=["return_none", "return_multiple"],
+    )
+    def test_query_tooling(self, task, rsps, records, expected):
+        rsps.add(
             "GET",
-            f"{self.devhub_base_url}/tooling/query/",
-            json={
-                "size": 2,
-                "records": [{"name": "Thing_1"}, {"name": "Thing_2"}],
-                "done": True,
-            },
+            TOOLING_QUERY_URL,
+            body=_query_body(records),
+            content_type="application/json",
         )
-        result = task._query_tooling(["Id", "name"], "sObjectName")
-        assert isinstance(result, list)
-        assert len(result) == 2
+        assert task._query_tooling(["Id", "name"], "sObjectName") == expected
 
-    @responses.activate
-    def test_query_tooling__raise_error(self, task):
-        responses.add(
+    def test_query_tooling__raise_error(self, task, rsps):
+        rsps.add(
             "GET",
-            f"{self.devhub_base_url}/tooling/query/",
+            TOOLING_QUERY_URL,
             json={"size": 0, "records": [], "done": True},
         )
         with pytest.raises(
             CumulusCIException,
-            match="No records returned for query: SELECT Id, Field__c FROM sObjectName WHERE Id='12345'",
+            match=NO_RECORDS_ERROR,
         ):
             task._query_tooling(
                 ["Id", "Field__c"], "sObjectName", "Id='12345'", raise_error=True